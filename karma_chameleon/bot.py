@@ -16,23 +16,35 @@ Defines the bot that which is passed Slack event message text and responds to th
 accordingly
 """
 
-import json
+import atexit
+import heapq
 import logging
+import mmap
 import os
 import re
-from collections import namedtuple
+import threading
+import time
+from operator import itemgetter
 from pathlib import Path
 from typing import Tuple
 from typing import Union
 
+import orjson
 from slack_bolt import App
-from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
-from tabulate import tabulate
 
-from karma_chameleon.karma_item import KarmaItem, KarmaItemEncoder
+from karma_chameleon.karma_item import ENCODER, KarmaItem
 from karma_chameleon.snark import get_positive_message, get_negative_message
 
+logger = logging.getLogger("karma_chameleon.bot")
+
+# Captures the first token of a message, minus any leading "#" or "@" and any trailing
+# karma operation.
+_ITEM_RE = re.compile(r"\s*[#@]?(\S*?)(?:\+\+|--)?(?:\s|$)")
+
+# Matches a URL.  The pattern is shamelessly copied from https://urlregex.com/.
+_URL_RE = re.compile(r"https?://(?:[\w]|[$-_]|[!*\(\),]|(%[0-9a-fA-F][0-9a-fA-F]))+")
+
 
 class KarmaBot(App):
     """Basic Bot object which is able to read incoming messages from Slack and return
@@ -45,17 +57,53 @@ class KarmaBot(App):
 
         self.karma = {}
         self.karma_file_path = os.environ.get("KARMA_FILE_PATH")
-        self.inc_regex = re.compile(r"^\S+\s?\+\+.*$")
-        self.dec_regex = re.compile(r"^\S+\s?--.*$")
+        # A single pattern matches both increments and decrements; the "op" group says which.
+        # Only the start of the message matters, so the pattern stops at the operator.
+        self.karma_regex = re.compile(r"^\S+\s?(?P<op>\+\+|--)")
+
+        # Every karma change is appended to a journal next to the save-file, which is a
+        # constant-size write regardless of how much karma there is.  A background thread
+        # compacts the journal into the save-file once it holds _compact_threshold entries
+        # or its oldest entry is _compact_max_age seconds old, and any remaining entries are
+        # compacted on shutdown.  Journal entries are numbered, and the save-file records
+        # the number of the last entry it includes, so that entries which are still in the
+        # journal after a compaction was interrupted are not applied twice.
+        self._journal_path = f"{self.karma_file_path}.log"
+        self._journal_seq = 0
+        self._journal_entries = 0
+        self._journal_started = 0.0
+        self._compact_threshold = 100
+        self._compact_max_age = 300.0
+        self._compact_interval = 30.0
+        self._compact_requested = threading.Event()
+        # _journal_lock guards the karma and the journal, and is held by every karma event.
+        # _compact_lock only keeps compactions from overlapping, so that the save-file can
+        # be written without holding up karma events.
+        self._journal_lock = threading.Lock()
+        self._compact_lock = threading.Lock()
+
+        # Cache of Slack user IDs to names, refreshed at most every _users_cache_ttl seconds.
+        self._users_cache = None
+        self._users_cache_time = 0.0
+        self._users_cache_ttl = 300.0
+        # Cache of the names of karma senders, keyed by user ID and holding (expiry, name).
+        self._usernames = {}
 
         # Load any saved karma
         self._load_karma_from_json_file()
 
+        # pylint: disable=consider-using-with
+        self._journal = open(self._journal_path, "ab", buffering=0)
+        threading.Thread(target=self._compact_loop, daemon=True).start()
+        atexit.register(self._compact_journal)
+
         self.logger.debug("KarmaBot initialized")
 
     @property
     def logger(self):
-        return logging.getLogger("karma_chameleon.bot")
+        # App.logger is a read-only property, so override it to hand back the bot's own
+        # logger, which is fetched once at import rather than on every log call.
+        return logger
 
     def _load_karma_from_json_file(self) -> None:
         self.logger.debug("Loading karma from file %s", self.karma_file_path)
@@ -64,24 +112,201 @@ class KarmaBot(App):
             self.logger.debug("No existing karma file found. Will start fresh.")
             with open(self.karma_file_path, "w", encoding="utf-8") as file_ptr:
                 file_ptr.write("[]")
+            saved_seq = 0
+        else:
+            # Parse straight out of the page cache rather than copying the file into memory.
+            with open(self.karma_file_path, "rb") as file_ptr, mmap.mmap(
+                file_ptr.fileno(), 0, access=mmap.ACCESS_READ
+            ) as karma_map, memoryview(karma_map) as karma_view:
+                saved = orjson.loads(karma_view)
+            # A bare list is a save-file from before the journal, so it includes no entries.
+            if isinstance(saved, list):
+                saved = {"seq": 0, "karma": saved}
+            self.karma.update(
+                {
+                    item["name"]: KarmaItem(item["name"], item["pluses"], item["minuses"])
+                    for item in saved["karma"]
+                }
+            )
+            saved_seq = saved["seq"]
+        self._replay_karma_journal(saved_seq)
+
+    def _replay_karma_journal(self, saved_seq: int) -> None:
+        """Apply any karma operations which were journaled after the save-file was last
+        written.  Entries which the save-file already includes are skipped, and a torn
+        final entry is cut off the journal, so that new entries aren't appended to it.
+
+        Arguments:
+        saved_seq -- the number of the last journal entry included in the save-file
+        """
+        self._journal_seq = max(self._journal_seq, saved_seq)
+        if not Path(self._journal_path).is_file():
             return
-        with open(self.karma_file_path, "r", encoding="utf-8") as file_ptr:
-            karma_list = json.load(file_ptr, object_hook=KarmaItem.dict_to_karma_item)
-        for item in karma_list:
-            self.karma[item.name] = item
+        self.logger.debug("Replaying karma journal %s", self._journal_path)
+        good_size = 0
+        torn = False
+        with open(self._journal_path, "rb") as file_ptr:
+            for line in file_ptr:
+                entry = self._parse_journal_entry(line)
+                if entry is None:
+                    # A torn write from a crash can only ever be the final line.
+                    self.logger.warning("Discarding corrupt karma journal entry: %s", line)
+                    torn = True
+                    break
+                good_size += len(line)
+                if entry["seq"] <= saved_seq:
+                    continue
+                name = entry["name"]
+                karma_item = self.karma.get(name)
+                if karma_item is None:
+                    karma_item = self.karma[name] = KarmaItem(name)
+                if entry["op"] == "+":
+                    karma_item.bump_plus()
+                else:
+                    karma_item.bump_minus()
+                self._journal_seq = entry["seq"]
+                self._journal_entries += 1
+        if torn:
+            os.truncate(self._journal_path, good_size)
+        if self._journal_entries:
+            self._journal_started = time.monotonic()
+
+    @staticmethod
+    def _parse_journal_entry(line: bytes) -> Union[dict, None]:
+        """Returns the karma operation held by a line of the journal, or None if the line
+        is corrupt.
+        """
+        # A line missing its newline is torn, even if what is there parses.
+        if not line.endswith(b"\n"):
+            return None
+        try:
+            return orjson.loads(line)
+        except orjson.JSONDecodeError:
+            return None
+
+    def _snapshot_karma(self) -> bytes:
+        """Serialize all karma, along with the number of the last journal entry it includes.
+        The caller must hold _journal_lock, so that the two agree.
+        """
+        saved = {"seq": self._journal_seq, "karma": list(self.karma.values())}
+        return orjson.dumps(saved, default=ENCODER.default)
 
-    def _save_karma_to_json_file(self) -> None:
+    def _save_karma_to_json_file(self, snapshot: bytes) -> None:
+        """Replace the save-file with a snapshot of the karma.
+
+        Arguments:
+        snapshot -- the karma, as serialized by _snapshot_karma
+        """
         self.logger.debug("Saving karma JSON to file %s", self.karma_file_path)
-        karma_list = list(self.karma.values())
-        with open(self.karma_file_path, "w", encoding="utf-8") as file_ptr:
-            json.dump(karma_list, file_ptr, cls=KarmaItemEncoder)
+        tmp_path = f"{self.karma_file_path}.tmp"
+        with open(tmp_path, "wb") as file_ptr:
+            file_ptr.write(snapshot)
+            # The journal is trimmed once this returns, so the new save-file must be on
+            # disk before it replaces the old one, and so must the rename itself.
+            file_ptr.flush()
+            os.fsync(file_ptr.fileno())
+        os.replace(tmp_path, self.karma_file_path)
+        dir_fd = os.open(os.path.dirname(os.path.abspath(self.karma_file_path)), os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+    def _journal_karma_op(self, op: str, name: str) -> None:
+        """Append a single karma operation to the journal.  The caller must hold
+        _journal_lock.
+
+        Arguments:
+        op -- "+" for an increment or "-" for a decrement
+        name -- the name of the item whose karma was changed
+        """
+        if not self._journal_entries:
+            self._journal_started = time.monotonic()
+        self._journal_seq += 1
+        entry = {"seq": self._journal_seq, "op": op, "name": name}
+        self._journal.write(orjson.dumps(entry) + b"\n")
+        self._journal_entries += 1
+        if self._journal_entries == self._compact_threshold:
+            self._compact_requested.set()
+
+    def _trim_journal(self, size: int) -> None:
+        """Drop the first size bytes, which are included in the save-file, from the journal.
+        The caller must hold _journal_lock.
+
+        Arguments:
+        size -- the size of the journal when the save-file's snapshot was taken
+        """
+        if os.fstat(self._journal.fileno()).st_size == size:
+            # Nothing was journaled while the save-file was written, which is the usual case.
+            self._journal.truncate(0)
+            return
+        # Keep what was journaled since, swapping in the trimmed journal in one step so that
+        # a crash can't lose those entries.
+        with open(self._journal_path, "rb") as file_ptr:
+            file_ptr.seek(size)
+            remainder = file_ptr.read()
+        tmp_path = f"{self._journal_path}.tmp"
+        with open(tmp_path, "wb") as file_ptr:
+            file_ptr.write(remainder)
+        os.replace(tmp_path, self._journal_path)
+        # pylint: disable=consider-using-with
+        journal = open(self._journal_path, "ab", buffering=0)
+        self._journal.close()
+        self._journal = journal
+
+    def _compact_journal(self) -> None:
+        """Save all karma to the json save-file and trim the saved entries from the journal,
+        if the journal has any entries in it.
+
+        _journal_lock is only held to take the snapshot and to trim the journal, and not
+        while the save-file is written and flushed to disk, so karma events carry on in the
+        meantime.
+        """
+        with self._compact_lock:
+            with self._journal_lock:
+                if not self._journal_entries:
+                    return
+                snapshot_seq = self._journal_seq
+                snapshot_size = os.fstat(self._journal.fileno()).st_size
+                snapshot = self._snapshot_karma()
+            try:
+                self._save_karma_to_json_file(snapshot)
+                with self._journal_lock:
+                    # Should this not happen, the save-file's sequence number keeps the
+                    # entries from being applied again on the next load.
+                    self._trim_journal(snapshot_size)
+                    self._journal_entries = self._journal_seq - snapshot_seq
+            except OSError:
+                self.logger.exception("Failed to compact karma journal, will retry.")
+
+    def _compaction_due(self) -> bool:
+        """Returns True if the journal is either large enough or old enough that it should
+        be compacted.
+        """
+        if not self._journal_entries:
+            return False
+        if self._journal_entries >= self._compact_threshold:
+            return True
+        return time.monotonic() - self._journal_started >= self._compact_max_age
+
+    def _compact_loop(self) -> None:
+        """Compact the journal once it grows large or old enough.  The thread is woken as
+        soon as the journal reaches _compact_threshold entries, and otherwise checks the
+        journal's age every _compact_interval seconds.  Runs forever in a daemon thread.
+        """
+        while True:
+            self._compact_requested.wait(self._compact_interval)
+            self._compact_requested.clear()
+            if self._compaction_due():
+                self._compact_journal()
 
     @staticmethod
     def _clean_up_msg_text(msg: dict) -> str:
         """Clean up the passed message.  Format should be (TOKEN(++|--) trailing_garbage).
         All we need to do here is get the first token and strip off the last two chars.
         If the token contains either a '#' or a '@', then that leading character is also
-        stripped.
+        stripped.  This is all done in a single pass of _ITEM_RE, so the rest of the message
+        is never split up.
 
         Arguments:
         msg -- text which contains a karma operation
@@ -89,50 +314,97 @@ class KarmaBot(App):
         Returns:
         Cleaned message
         """
-        msg = msg["text"].split()[0]  # remove trailing garbage
-        if msg[-2:] in ("++", "--"):
-            msg = msg[:-2]
-        if msg[0] in ("#", "@"):
-            msg = msg[1:]
-        return msg
+        return _ITEM_RE.match(msg["text"]).group(1)
 
     @staticmethod
     def _check_for_self_bump(msg: dict) -> bool:
         """Returns true if the passed message text contains a self-bump, i.e. the sending
-        username is also present in the text as the karma target.
+        user is also mentioned in the text as the karma target.  Slack renders mentions as
+        <@ID>, or <@ID|name> in escaped slash-command text, so matching the full mention
+        keeps a user ID from matching inside a longer one.
         """
-        return msg["user"] in msg["text"]
+        text = msg["text"]
+        user = msg["user"]
+        return f"<@{user}>" in text or f"<@{user}|" in text
 
     @staticmethod
     def _check_for_url(msg: dict) -> bool:
         """Returns True if the passed message text contains the -- token as part of a
         larger URL string.
-
-        The URL regex is shamelessly copied from https://urlregex.com/.
         """
-        url_re = re.compile(r"https?://(?:[\w]|[$-_]|[!*\(\),]|(%[0-9a-fA-F][0-9a-fA-F]))+")
+        text = msg["text"]
+        # Every URL matched by _URL_RE starts with "http", so most messages can skip the
+        # split and the regex altogether.
+        if "http" not in text:
+            return False
 
-        for word in msg["text"].split():
+        for word in text.split():
             # As of the writing of this code, "++" is not able to be included, unencoded,
             # in a URL.
-            if "--" in word:
-                return re.match(url_re, word) is not None
+            if "--" not in word:
+                continue
+            return _URL_RE.match(word) is not None
         return False
 
+    @staticmethod
+    def _user_display_name(user: dict) -> Union[str, None]:
+        """Returns the name to show for a Slack user object, as returned by either users.info
+        or users.list: their real name, or their username if they have no real name.
+        """
+        return user.get("real_name") or user.get("name")
+
+    def _get_user_names(self) -> dict:
+        """Return a dict mapping Slack user IDs to names.  The workspace's user list is
+        only fetched from Slack when the cached copy is older than _users_cache_ttl.
+
+        Raises:
+        SlackApiError if the user list could not be fetched.
+        """
+        now = time.monotonic()
+        if self._users_cache is not None and now - self._users_cache_time < self._users_cache_ttl:
+            return self._users_cache
+
+        request = self.client.users_list()
+        if not request["ok"]:
+            return {}
+        # Members with neither a real name nor a username are left out.
+        ids_to_names = {
+            member["id"]: name
+            for member in request["members"]
+            if (name := self._user_display_name(member))
+        }
+        self._users_cache = ids_to_names
+        self._users_cache_time = now
+        return ids_to_names
+
     def get_username_from_uid(self, uid: str) -> Union[str, None]:
-        """Fetch the username corresponding to the passed UID string."""
+        """Fetch the username corresponding to the passed UID string.  Names are cached for
+        _users_cache_ttl seconds, so that a busy user's karma doesn't cost an API call each.
+        """
         if not uid:
             return None
 
+        now = time.monotonic()
+        cached = self._usernames.get(uid)
+        if cached is not None and now < cached[0]:
+            return cached[1]
+        # The user list fetched for the leaderboard may already hold the name.
+        if self._users_cache is not None and now - self._users_cache_time < self._users_cache_ttl:
+            username = self._users_cache.get(uid)
+            if username is not None:
+                return username
+
         try:
-            client = WebClient(token=os.environ.get("SLACK_BOT_TOKEN"))
-            result = client.users_info(user=uid)
-            return result["user"]["real_name"]
+            result = self.client.users_info(user=uid)
+            username = self._user_display_name(result["user"])
 
         except SlackApiError as err:
             self.logger.error("Error fetching username for %s: %s", uid, err)
             return None
 
+        self._usernames[uid] = (now + self._users_cache_ttl, username)
+        return username
+
     def increment_karma(self, msg: dict) -> str:
         """Increment karma for a passed item, and pass a corresponding message to the
         channel inside which the karma was bumped to be sent.
@@ -151,12 +423,14 @@ class KarmaBot(App):
         tail = f", thanks to {self.get_username_from_uid(msg['user'])}."
 
         item = self._clean_up_msg_text(msg)
-        if not self.karma.get(item):
-            self.karma[item] = KarmaItem(item)
-        self.karma[item].pluses += 1
+        with self._journal_lock:
+            karma_item = self.karma.get(item)
+            if karma_item is None:
+                karma_item = self.karma[item] = KarmaItem(item)
+            karma_item.bump_plus()
+            self._journal_karma_op("+", item)
         snark = get_positive_message()
-        total = self.karma[item].total_score
-        self._save_karma_to_json_file()
+        total = karma_item.total_score
         self.logger.debug("Got increment for %s", item)
         return f"{snark} {item} now has {total} points{tail}"
 
@@ -179,15 +453,50 @@ class KarmaBot(App):
             return None  # Fail silently... no need to respond to the user.
 
         item = self._clean_up_msg_text(msg)
-        if not self.karma.get(item):
-            self.karma[item] = KarmaItem(item)
-        self.karma[item].minuses += 1
+        with self._journal_lock:
+            karma_item = self.karma.get(item)
+            if karma_item is None:
+                karma_item = self.karma[item] = KarmaItem(item)
+            karma_item.bump_minus()
+            self._journal_karma_op("-", item)
         snark = get_negative_message()
-        total = self.karma[item].total_score
-        self._save_karma_to_json_file()
+        total = karma_item.total_score
         self.logger.debug("Got decrement for %s", item)
         return f"{snark} {item} now has {total} points."
 
+    @staticmethod
+    def _format_leaderboard(rows: list) -> str:
+        """Render leaderboard rows as a GitHub-flavored markdown table, laid out just as
+        tabulate's "github" format would: names are left-aligned, scores and their headers
+        are right-aligned, and every column is at least two wider than its header.
+
+        Arguments:
+        rows -- (name, pluses, minuses, net score) rows, in display order
+
+        Returns:
+        The table, one line per row, preceded by a header and separator line.
+        """
+        headers = ("Name", "Pluses", "Minuses", "Net Score")
+        table = [(row[0], str(row[1]), str(row[2]), str(row[3])) for row in rows]
+        widths = [
+            max([len(header) + 2] + [len(row[col]) for row in table])
+            for col, header in enumerate(headers)
+        ]
+
+        # With no rows, there are no scores to right-align the headers with.
+        header_cells = [headers[0].ljust(widths[0])] + [
+            header.rjust(width) if table else header.ljust(width)
+            for header, width in zip(headers[1:], widths[1:])
+        ]
+        lines = [f"| {' | '.join(header_cells)} |"]
+        lines.append(f"|{'|'.join('-' * (width + 2) for width in widths)}|")
+        for row in table:
+            cells = [row[0].ljust(widths[0])] + [
+                cell.rjust(width) for cell, width in zip(row[1:], widths[1:])
+            ]
+            lines.append(f"| {' | '.join(cells)} |")
+        return "\n".join(lines)
+
     # TODO(dschoenbrun): Refactor the function below because it has too many local variables and
     #  is too complex.
     # pylint: disable=too-many-locals
@@ -198,59 +507,34 @@ class KarmaBot(App):
         A message, if applicable, a string representation of the user leaderboard, and a
         string representation of the thing leaderboard.
         """
-        Row = namedtuple("Row", "name pluses minuses net_score")
-        try:
-            with open(self.karma_file_path, "r", encoding="utf-8") as karma_file:
-                cur_karma = json.load(karma_file)
-
-            user_table = []
-            thing_table = []
-            for item in cur_karma:
-                name = item["name"]
-                pluses = item["pluses"]
-                minuses = item["minuses"]
-                delta = pluses - minuses
-
-                if name.startswith("<@"):
-                    name = name.lstrip("<@").rstrip(">")
-                    user_table.append(Row(name, pluses, minuses, delta))
-                elif name.startswith("<!"):  # Special case for @everyone, @channel, @here
-                    name = name.lstrip("<!").rstrip(">")
-                    user_table.append(Row(name, pluses, minuses, delta))
-                else:
-                    thing_table.append(Row(name, pluses, minuses, delta))
-            assert user_table or thing_table
-        except (ValueError, AssertionError):  # Empty file or no file present
-            self.logger.exception("Empty karma file or no file present, return.")
+        # The in-memory karma is authoritative, so there is no need to go back to disk.
+        if not self.karma:
             return "No karma yet!", "", ""
-        try:
-            web_client = WebClient(token=os.environ.get("SLACK_BOT_TOKEN"))
-            request = web_client.users_list()
-            ids_to_names = {}
-            if request["ok"]:
-                for member in request["members"]:
-                    try:
-                        name = member.get("real_name") or member.get("name")
-                        assert name
-                        ids_to_names[member["id"]] = name
-                    except AssertionError:
-                        self.logger.debug("Unable to get name for id %s", member["id"])
-
-            # Convert user IDs to actual names
-            usr_table = []
-            for row in user_table:
-                if row.name in ids_to_names:
-                    name = ids_to_names[row.name]
-                    usr_table.append(Row(name, row.pluses, row.minuses, row.net_score))
-                else:
-                    usr_table.append(row)
-
-            usr_table = sorted(usr_table, reverse=True, key=lambda x: x.net_score)[:10]
-            thing_table = sorted(thing_table, reverse=True, key=lambda x: x.net_score)[:10]
 
-            headers = ["Name", "Pluses", "Minuses", "Net Score"]
-            users = tabulate([list(row) for row in usr_table], headers, tablefmt="github")
-            things = tabulate([list(row) for row in thing_table], headers, tablefmt="github")
+        # Rows are plain (name, pluses, minuses, net score) tuples.
+        user_table = []
+        thing_table = []
+        for item in list(self.karma.values()):
+            name = item.name
+
+            # "<@ID>" is a user mention, and "<!...>" is @everyone, @channel or @here.
+            if name.startswith(("<@", "<!")):
+                user_table.append((name[2:-1], item.pluses, item.minuses, item.total_score))
+            else:
+                thing_table.append((name, item.pluses, item.minuses, item.total_score))
+        try:
+            ids_to_names = self._get_user_names()
+
+            # Only the top ten users are shown, so only they need their IDs converted to
+            # actual names.
+            usr_table = [
+                (ids_to_names.get(uid, uid), *scores)
+                for uid, *scores in heapq.nlargest(10, user_table, key=itemgetter(3))
+            ]
+            thing_table = heapq.nlargest(10, thing_table, key=itemgetter(3))
+
+            users = self._format_leaderboard(usr_table)
+            things = self._format_leaderboard(thing_table)
 
             return (
                 "",
@@ -20,13 +20,20 @@ from typing import Any
 
 
 class KarmaItem:
-    """Object representation of a thing, and the karma associated with that thing."""
+    """Object representation of a thing, and the karma associated with that thing.
+
+    total_score, which is pluses - minuses, is stored rather than calculated on each
+    access, so karma should be changed through bump_plus() and bump_minus(), which keep
+    it up to date.
+    """
+
+    __slots__ = ("name", "pluses", "minuses", "total_score")
 
     def __init__(self, name: str, pluses: int = 0, minuses: int = 0) -> None:
-        super().__init__()
         self.name = name
         self.pluses = pluses
         self.minuses = minuses
+        self.total_score = pluses - minuses
 
     def __repr__(self) -> str:
         return self.__class__.__name__ + f"('{self.name}', {self.pluses}, {self.minuses})"
@@ -49,14 +56,15 @@ class KarmaItem:
 
         return self.name + pluses_msg + minuses_msg + total_msg
 
-    @property
-    def total_score(self) -> int:
-        """
-        Calculated property which returns the total score which is pluses - minuses.
+    def bump_plus(self) -> None:
+        """Add a single plus to this item."""
+        self.pluses += 1
+        self.total_score += 1
 
-        Returns: The current total score of the KarmaItem.
-        """
-        return self.pluses - self.minuses
+    def bump_minus(self) -> None:
+        """Add a single minus to this item."""
+        self.minuses += 1
+        self.total_score -= 1
 
     @staticmethod
     def dict_to_karma_item(a_dict: dict):
@@ -86,6 +94,12 @@ class KarmaItemEncoder(json.JSONEncoder):
     """
 
     def default(self, o: Any) -> Any:
-        if isinstance(o, KarmaItem):
+        # KarmaItem is never subclassed, so an exact type check is enough, and cheaper
+        # than isinstance() for every item in a save.
+        if type(o) is KarmaItem:  # pylint: disable=unidiomatic-typecheck
             return {"name": o.name, "pluses": o.pluses, "minuses": o.minuses}
         return super().default(o)
+
+
+# A shared encoder, so that saving karma doesn't construct a new one each time.
+ENCODER = KarmaItemEncoder()
@@ -23,7 +23,7 @@ import os
 from logging.handlers import RotatingFileHandler
 from typing import Callable, Union
 
-from slack_bolt import Ack, BoltResponse, Say
+from slack_bolt import Ack, BoltContext, BoltResponse, Say
 from slack_bolt.adapter.socket_mode import SocketModeHandler
 
 from karma_chameleon.bot import KarmaBot
@@ -34,19 +34,47 @@ from karma_chameleon.bot import KarmaBot
 # and debug info pertaining to the event_manager.py methods.  karma_chameleon.bot logs
 # events and debug info pertaining to the methods of the KarmaBot class.
 #
-# If the logs dir does not exit, make it.
-if not os.path.exists("logs"):
-    os.makedirs("logs")
-
 # Create the "main" logger.  This logger has the file destination and line format that is
 # inherited by all sub-loggers.
 logger = logging.getLogger("karma_chameleon")
-logger.setLevel(logging.DEBUG)
-file_handler = RotatingFileHandler("logs/karma_chameleon.log", maxBytes=10_000_000, backupCount=3)
-file_handler.setLevel(logging.DEBUG)
-formatter = logging.Formatter("%(asctime)s %(name)s %(levelname)s[%(funcName)s]: %(message)s")
-file_handler.setFormatter(formatter)
-logger.addHandler(file_handler)
+
+
+def _configure_logging() -> None:
+    """Send the main logger's output to the rotating log file.  The module may be imported
+    more than once (e.g. both as __main__ and as karma_chameleon.main), so the handler is
+    only set up the first time, lest every line be written to the log file once per import.
+
+    Debug logging is on by default.  Production deployments may set KARMA_LOG_LEVEL to e.g.
+    INFO, in which case the per-event debug lines are dropped before a log record is ever
+    built.  An unknown level falls back to INFO, rather than keeping the bot from starting.
+    """
+    if logger.handlers:
+        return
+
+    # If the logs dir does not exit, make it.
+    os.makedirs("logs", exist_ok=True)
+
+    log_level = os.environ.get("KARMA_LOG_LEVEL", "DEBUG").upper()
+    known_level = log_level in logging.getLevelNamesMapping()
+    if not known_level:
+        log_level = "INFO"
+    logger.setLevel(log_level)
+    file_handler = RotatingFileHandler(
+        "logs/karma_chameleon.log", maxBytes=10_000_000, backupCount=3
+    )
+    file_handler.setLevel(log_level)
+    formatter = logging.Formatter("%(asctime)s %(name)s %(levelname)s[%(funcName)s]: %(message)s")
+    file_handler.setFormatter(formatter)
+    logger.addHandler(file_handler)
+
+    if not known_level:
+        logger.warning(
+            "Unknown KARMA_LOG_LEVEL %s, logging at INFO instead.",
+            os.environ["KARMA_LOG_LEVEL"],
+        )
+
+
+_configure_logging()
 
 app = KarmaBot(
     token=os.environ.get("SLACK_BOT_TOKEN"),
@@ -58,7 +86,7 @@ def log_message(
     body: dict, next: Callable  # pylint: disable=redefined-builtin
 ) -> Union[Callable, BoltResponse]:  # pylint: disable=unsubscriptable-object
     """Log all incoming messages."""
-    logger.debug("Received message: %s", str(body))
+    logger.debug("Received message: %s", body)
     return next()
 
 
@@ -87,7 +115,9 @@ def handle_no_karma_op(
 
     if body["event"]["type"] == "message" and "text" in body["event"]:
         msg = body["event"]["text"]
-        if app.inc_regex.match(msg) or app.dec_regex.match(msg):
+        # Most messages contain neither operator, so a plain substring check lets us skip
+        # the regex entirely for them.
+        if ("++" in msg or "--" in msg) and app.karma_regex.match(msg):
             return next()
     # This is too chatty to be left enabled, but it may be useful for debug in the future.
     # logger.debug("Ignoring event with no karma operation")
@@ -133,7 +163,24 @@ def handle_karma_command(ack: Ack, say: Say, command: dict) -> None:
         say("Hmmm... this doesn't look right.  Syntax is '/k SUBJECT (++|--) [FLAVOR]'")
 
 
-@app.message(app.inc_regex)
+@app.message(app.karma_regex)
+def handle_karma_op(message: dict, say: Say, context: BoltContext) -> None:
+    """Dispatches a message containing a karma operation to either increment or decrement,
+    depending on which operation was matched by the bot's karma regex.
+
+    Arguments:
+    message -- dictionary representation of the message which contains a karma operation
+    say -- The method for outputting the response to the channel from which the command
+    was run.
+    context -- The Bolt context of the event, which holds the operation matched by the
+    karma regex.
+    """
+    if context["matches"][0] == "++":
+        increment(message, say)
+    else:
+        decrement(message, say)
+
+
 def increment(message: dict, say: Say) -> None:
     """Passes the message along for to the KarmaChameleon bot, then posts a response based
     on the return value of the bot's increment method.
@@ -147,7 +194,6 @@ def increment(message: dict, say: Say) -> None:
     say(rsp)
 
 
-@app.message(app.dec_regex)
 def decrement(message: dict, say: Say) -> None:
     """Passes the message along for to the KarmaChameleon bot, then posts a response based
     on the return value of the bot's decrement method.
@@ -13,9 +13,11 @@
 
 """Snark contains super-clever responses for the Chameleon to use."""
 
+import itertools
 import random
+from typing import Iterator
 
-positive_messages = [
+positive_messages = (
     "Groovy.",
     "Radical.",
     "Bodacious.",
@@ -66,9 +68,9 @@ positive_messages = [
     ":drake-yes:.",
     "Ayyyyy.",
     "This pleases the :lizard:.",
-]
+)
 
-negative_messages = [
+negative_messages = (
     "Brutal.",
     "Get Wrecked.",
     "Too bad.",
@@ -112,14 +114,25 @@ negative_messages = [
     "Atrocious.",
     "Abominable.",
     "Sub-par.",
-]
+)
+
+
+def _shuffled_cycle(messages: tuple) -> Iterator[str]:
+    """Shuffle a copy of messages once, and return an endless iterator over it."""
+    shuffled = list(messages)
+    random.shuffle(shuffled)
+    return itertools.cycle(shuffled)
+
+
+_positive_cycle = _shuffled_cycle(positive_messages)
+_negative_cycle = _shuffled_cycle(negative_messages)
 
 
 def get_positive_message() -> str:
-    """Return a random selection from positive_messages"""
-    return random.choice(positive_messages)
+    """Return the next message from a shuffled cycle of positive_messages"""
+    return next(_positive_cycle)
 
 
 def get_negative_message() -> str:
-    """Return a random selection from negative_messages"""
-    return random.choice(negative_messages)
+    """Return the next message from a shuffled cycle of negative_messages"""
+    return next(_negative_cycle)
@@ -17,6 +17,7 @@ Unit testing for the KarmaChameleon App proper.
 
 import contextlib
 import io
+import logging
 import os
 from unittest import TestCase
 from unittest import mock
@@ -32,7 +33,10 @@ with mock.patch.dict(
 ):
     with mock.patch("slack_bolt.App._init_middleware_list"):
         from karma_chameleon.main import (
+            _configure_logging,
+            logger,
             handle_no_karma_op,
+            handle_karma_op,
             increment,
             decrement,
         )
@@ -89,12 +93,31 @@ class TestApp(TestCase):
                 {"event": {"type": "message", "text": "foobarbaz--"}},
                 lambda x: x == self.callable_called,
             ),  # -- karma event
+            (
+                {"event": {"type": "message", "text": "foobarbaz++\nfor the help"}},
+                lambda x: x == self.callable_called,
+            ),  # karma event with a multi-line reason
         ]
 
         for body, verify_method in bodies:
             retval = handle_no_karma_op(body, self._next_method)
             assert verify_method(retval)
 
+    @mock.patch("karma_chameleon.bot.KarmaBot.decrement_karma")
+    @mock.patch("karma_chameleon.bot.KarmaBot.increment_karma")
+    def test_handle_karma_op(self, app_inc_karma, app_dec_karma) -> None:
+        """Test that karma operations are dispatched to the matching bot method."""
+        app_inc_karma.return_value = "incremented"
+        app_dec_karma.return_value = "decremented"
+
+        for op, msg in [("++", "incremented"), ("--", "decremented")]:
+            with contextlib.redirect_stdout(io.StringIO()) as out:
+                handle_karma_op(self.test_msg, self._say_method, {"matches": (op,)})
+                assert out.getvalue() == msg + "\n"
+
+        assert app_inc_karma.call_count == 1
+        assert app_dec_karma.call_count == 1
+
     @mock.patch("karma_chameleon.bot.KarmaBot.increment_karma")
     def test_increment(self, app_inc_karma) -> None:
         """Test the method of the main app which calls the bot increment."""
@@ -127,3 +150,24 @@ class TestApp(TestCase):
             decrement(self.test_msg, self._say_method)
             assert app_dec_karma.inc_karma.called_with(self.test_msg)
             assert out.getvalue() == msg
+
+    @mock.patch.dict(os.environ, {"KARMA_LOG_LEVEL": "verbose"})
+    def test_unknown_log_level(self) -> None:
+        """Test that an unknown KARMA_LOG_LEVEL falls back to INFO, rather than raising."""
+        handlers = logger.handlers[:]
+        level = logger.level
+        for handler in handlers:
+            logger.removeHandler(handler)
+        try:
+            with mock.patch.object(logger, "warning") as warning:
+                _configure_logging()
+            assert logger.level == logging.INFO
+            assert [handler.level for handler in logger.handlers] == [logging.INFO]
+            warning.assert_called_once()
+        finally:
+            for handler in logger.handlers[:]:
+                logger.removeHandler(handler)
+                handler.close()
+            for handler in handlers:
+                logger.addHandler(handler)
+            logger.setLevel(level)
@@ -17,7 +17,7 @@ Unit testing for the KarmaChameleon KarmaItem class.
 
 from unittest import TestCase
 
-from karma_chameleon.karma_item import KarmaItem, KarmaItemEncoder
+from karma_chameleon.karma_item import ENCODER, KarmaItem, KarmaItemEncoder
 
 
 class TestKarmaItem(TestCase):
@@ -37,6 +37,17 @@ class TestKarmaItem(TestCase):
         item = KarmaItem("foobar", 3, 2)
         assert str(item) == "foobar has 3 pluses and 2 minuses for a total of 1 point."
 
+    @staticmethod
+    def test_slots() -> None:
+        """Verify that KarmaItem does not carry a per-instance __dict__"""
+        item = KarmaItem("foobar", 1, 2)
+        assert not hasattr(item, "__dict__")
+        try:
+            item.foo = "bar"
+        except AttributeError:
+            return
+        assert False, "KarmaItem accepted an attribute not in __slots__"
+
     @staticmethod
     def test_total_score() -> None:
         """Verify the functionality of KarmaItem.total_score"""
@@ -46,6 +57,20 @@ class TestKarmaItem(TestCase):
         item = KarmaItem("foobar", 10, 20)
         assert item.total_score == -10
 
+        item = KarmaItem("foobar")
+        assert item.total_score == 0
+
+    @staticmethod
+    def test_bump() -> None:
+        """Verify that bumping a KarmaItem keeps its total score up to date"""
+        item = KarmaItem("foobar", 3, 1)
+        item.bump_plus()
+        assert (item.pluses, item.minuses, item.total_score) == (4, 1, 3)
+
+        item.bump_minus()
+        item.bump_minus()
+        assert (item.pluses, item.minuses, item.total_score) == (4, 3, 1)
+
     @staticmethod
     def test_dict_to_karmaitem() -> None:
         """Verify that transforming a dict into a KarmaItem works"""
@@ -72,8 +97,7 @@ class TestKarmaItem(TestCase):
         # Passing an object to KarmaItemEncoder which is not a KarmaItem should use the
         # parent JSONEncoder class instead.
         """Verify that JSON serialization works"""
-        encoder = KarmaItemEncoder()
-        result = encoder.default(KarmaItem("foobarbaz", 9001, 10))
+        result = ENCODER.default(KarmaItem("foobarbaz", 9001, 10))
         assert isinstance(result, dict)
         assert result == {"name": "foobarbaz", "pluses": 9001, "minuses": 10}
 
@@ -81,7 +105,7 @@ class TestKarmaItem(TestCase):
         # thrown from the parent JSONEncoder class.
         failed = False
         try:
-            encoder.default({"foo": "bar"})
+            KarmaItemEncoder().default({"foo": "bar"})
         except TypeError:
             failed = True
         assert failed
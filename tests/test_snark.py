@@ -33,3 +33,12 @@ class TestSnark(TestCase):
         msg = snark.get_negative_message()
         assert msg
         assert msg in snark.negative_messages
+
+    @staticmethod
+    def test_snark_cycle() -> None:
+        """Verify that every message is used before any message is repeated"""
+        msgs = [snark.get_positive_message() for _ in snark.positive_messages]
+        assert sorted(msgs) == sorted(snark.positive_messages)
+
+        msgs = [snark.get_negative_message() for _ in snark.negative_messages]
+        assert sorted(msgs) == sorted(snark.negative_messages)